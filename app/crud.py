@@ -1,11 +1,30 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_, func
-from typing import List, Optional
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import or_, and_, func, insert, delete
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from typing import List, Optional, Tuple
+from datetime import datetime
+from pathlib import PurePosixPath
+import threading
 from app import models, schemas
-from app.storage import save_file, get_file_type_from_extension, delete_document_files
+from app.storage import save_file, get_file_type_from_extension
 from fastapi import UploadFile, HTTPException
 
 
+# Process-level read-through cache of tag name -> id. Tags are never deleted
+# or renamed, so entries never go stale; only committed rows are cached, so a
+# rolled-back upload cannot leave dangling ids behind.
+_tag_id_cache = {}
+_tag_id_cache_lock = threading.RLock()
+
+
+def clear_tag_id_cache() -> None:
+    """
+    Clears the tag id cache. Used by tests that drop and recreate the schema.
+    """
+    with _tag_id_cache_lock:
+        _tag_id_cache.clear()
+
+
 def get_or_create_tag(db: Session, tag_name: str) -> models.Tag:
     """
     Gets existing tag or creates new one.
@@ -23,12 +42,68 @@ def get_or_create_tag(db: Session, tag_name: str) -> models.Tag:
     if not tag:
         tag = models.Tag(name=tag_name)
         db.add(tag)
-        db.commit()
-        db.refresh(tag)
-    
+        db.flush()  # Assign tag.id; the caller's commit persists it
+
     return tag
 
 
+def get_or_create_tag_ids(db: Session, tag_names: List[str]) -> List[int]:
+    """
+    Resolves a batch of tag names to ids, creating missing tags.
+
+    Names seen before are served from the process-level cache without any
+    query; the rest cost one SELECT plus, for genuinely new tags, one bulk
+    upsert. Ids of pre-existing tags are cached for later requests; freshly
+    inserted ids are not cached until a later request reads them back, since
+    the enclosing transaction may still roll back.
+
+    Args:
+        db: Database session
+        tag_names: Tag names (normalized and de-duplicated internally)
+
+    Returns:
+        List of tag ids, ordered like the de-duplicated input names
+    """
+    # Normalize and de-duplicate while preserving order
+    names = list(dict.fromkeys(
+        name.strip().lower() for name in tag_names if name.strip()
+    ))
+
+    if not names:
+        return []
+
+    with _tag_id_cache_lock:
+        ids_by_name = {
+            name: _tag_id_cache[name] for name in names if name in _tag_id_cache
+        }
+
+    missing = [name for name in names if name not in ids_by_name]
+    if missing:
+        # Look up committed rows first so their ids can be cached
+        existing = db.query(models.Tag.id, models.Tag.name).filter(
+            models.Tag.name.in_(missing)
+        ).all()
+        with _tag_id_cache_lock:
+            for tag_id, name in existing:
+                _tag_id_cache[name] = tag_id
+        ids_by_name.update({name: tag_id for tag_id, name in existing})
+
+        to_create = [name for name in missing if name not in ids_by_name]
+        if to_create:
+            # Insert all new tags in one statement, ignoring races on name
+            db.execute(
+                sqlite_insert(models.Tag).values(
+                    [{"name": name} for name in to_create]
+                ).on_conflict_do_nothing(index_elements=['name'])
+            )
+            created = db.query(models.Tag.id, models.Tag.name).filter(
+                models.Tag.name.in_(to_create)
+            ).all()
+            ids_by_name.update({name: tag_id for tag_id, name in created})
+
+    return [ids_by_name[name] for name in names]
+
+
 def create_document(
     db: Session,
     title: str,
@@ -61,8 +136,7 @@ def create_document(
     
     # Save file (version 1)
     file_path, file_size = save_file(file, document.id, version_number=1)
-    file_ext = file.filename.split('.')[-1].lower() if '.' in file.filename else ''
-    file_type = get_file_type_from_extension(f".{file_ext}")
+    file_type = get_file_type_from_extension(PurePosixPath(file.filename).suffix)
     
     # Create version record
     version = models.DocumentVersion(
@@ -73,17 +147,24 @@ def create_document(
         file_type=file_type
     )
     db.add(version)
-    
-    # Process tags
+    db.flush()  # Get version.id for the latest-version pointer
+    document.latest_version = version
+    document.latest_version_number = 1
+
+    # Process tags: associate in one multi-row INSERT instead of per-tag
+    # relationship appends
     if tags_string:
         tag_names = [tag.strip() for tag in tags_string.split(',') if tag.strip()]
-        for tag_name in tag_names:
-            tag = get_or_create_tag(db, tag_name)
-            document.tags.append(tag)
+        tag_ids = get_or_create_tag_ids(db, tag_names)
+        if tag_ids:
+            db.execute(
+                insert(models.document_tags),
+                [{"document_id": document.id, "tag_id": tag_id} for tag_id in tag_ids]
+            )
+            db.expire(document, ['tags'])
     
     db.commit()
-    db.refresh(document)
-    
+
     return schemas.DocumentUploadResponse(
         document_id=document.id,
         version_number=1,
@@ -129,16 +210,36 @@ def add_document_version(
     if description is not None:  # Allow empty string to clear description
         document.description = description
     
-    # Update tags if provided
+    # Update tags if provided: diff against the current set so unchanged
+    # associations are left alone instead of delete-all + re-insert
     if tags_string is not None:
-        # Clear existing tags
-        document.tags.clear()
-        # Add new tags
-        if tags_string.strip():
-            tag_names = [tag.strip() for tag in tags_string.split(',') if tag.strip()]
-            for tag_name in tag_names:
-                tag = get_or_create_tag(db, tag_name)
-                document.tags.append(tag)
+        desired_names = list(dict.fromkeys(
+            tag.strip().lower() for tag in tags_string.split(',') if tag.strip()
+        ))
+        current_by_name = {tag.name: tag for tag in document.tags}
+        desired = set(desired_names)
+
+        tag_ids_to_remove = [
+            current_by_name[name].id for name in set(current_by_name) - desired
+        ]
+        if tag_ids_to_remove:
+            db.execute(
+                delete(models.document_tags).where(
+                    models.document_tags.c.document_id == document.id,
+                    models.document_tags.c.tag_id.in_(tag_ids_to_remove)
+                )
+            )
+
+        names_to_add = [name for name in desired_names if name not in current_by_name]
+        if names_to_add:
+            tag_ids_to_add = get_or_create_tag_ids(db, names_to_add)
+            db.execute(
+                insert(models.document_tags),
+                [{"document_id": document.id, "tag_id": tag_id} for tag_id in tag_ids_to_add]
+            )
+
+        if tag_ids_to_remove or names_to_add:
+            db.expire(document, ['tags'])
     
     # Get latest version number
     latest_version = db.query(models.DocumentVersion).filter(
@@ -149,8 +250,7 @@ def add_document_version(
     
     # Save file
     file_path, file_size = save_file(file, document_id, version_number=new_version_number)
-    file_ext = file.filename.split('.')[-1].lower() if '.' in file.filename else ''
-    file_type = get_file_type_from_extension(f".{file_ext}")
+    file_type = get_file_type_from_extension(PurePosixPath(file.filename).suffix)
     
     # Create version record
     version = models.DocumentVersion(
@@ -161,10 +261,10 @@ def add_document_version(
         file_type=file_type
     )
     db.add(version)
+    db.flush()  # Get version.id for the latest-version pointer
+    document.latest_version = version
+    document.latest_version_number = new_version_number
     db.commit()
-    db.refresh(version)
-    db.refresh(document)
-    
     return schemas.DocumentUploadResponse(
         document_id=document_id,
         version_number=new_version_number,
@@ -172,19 +272,68 @@ def add_document_version(
     )
 
 
-def get_documents(db: Session, skip: int = 0, limit: int = 100) -> List[models.Document]:
+def _paginate_documents(
+    query,
+    skip: int,
+    limit: int,
+    after_created_at: Optional[datetime],
+    after_id: Optional[int]
+):
+    """
+    Applies (created_at DESC, id DESC) ordering plus pagination to a Document
+    query. When a keyset cursor is given the query seeks directly past it
+    instead of falling back to OFFSET, whose cost grows with page depth.
+
+    The seek itself uses only the id: ids are assigned in creation order, so
+    id order and (created_at, id) order agree, and SQLite's CURRENT_TIMESTAMP
+    text format does not compare reliably against bound datetime parameters.
+    """
+    query = query.order_by(
+        models.Document.created_at.desc(),
+        models.Document.id.desc()
+    )
+    if after_id is not None:
+        query = query.filter(models.Document.id < after_id)
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit)
+
+
+def get_documents(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    after_created_at: Optional[datetime] = None,
+    after_id: Optional[int] = None
+) -> List[Tuple[models.Document, Optional[models.DocumentVersion], int]]:
     """
     Gets list of all documents with latest version info.
-    
+
+    The latest version is resolved through the denormalized
+    Document.latest_version_id pointer, so each row costs a single indexed
+    join instead of an aggregate over document_versions. Versions are
+    append-only, so latest_version_number doubles as the version count.
+
     Args:
         db: Database session
-        skip: Number of records to skip
+        skip: Number of records to skip (ignored when a cursor is given)
         limit: Maximum number of records to return
-        
+        after_created_at: Keyset cursor - created_at of the last row seen
+        after_id: Keyset cursor - id of the last row seen
+
     Returns:
-        List of Document models
+        List of (Document, latest DocumentVersion or None, version count) tuples
     """
-    return db.query(models.Document).offset(skip).limit(limit).all()
+    query = db.query(models.Document).options(
+        joinedload(models.Document.latest_version),
+        selectinload(models.Document.tags)
+    )
+    documents = _paginate_documents(query, skip, limit, after_created_at, after_id).all()
+
+    return [
+        (doc, doc.latest_version, doc.latest_version_number)
+        for doc in documents
+    ]
 
 
 def get_document_by_id(db: Session, document_id: int) -> Optional[models.Document]:
@@ -220,9 +369,9 @@ def get_document_versions(db: Session, document_id: int) -> Optional[schemas.Doc
         models.DocumentVersion.document_id == document_id
     ).order_by(models.DocumentVersion.version_number.asc()).all()
     
-    version_responses = [
-        schemas.DocumentVersionResponse.model_validate(v) for v in versions
-    ]
+    version_responses = schemas.version_list_adapter.validate_python(
+        versions, from_attributes=True
+    )
     
     return schemas.DocumentVersionsResponse(
         document_id=document.id,
@@ -236,18 +385,22 @@ def search_documents_by_tags(
     tags: List[str],
     match_all: bool = False,
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    after_created_at: Optional[datetime] = None,
+    after_id: Optional[int] = None
 ) -> List[models.Document]:
     """
     Searches documents by tags.
-    
+
     Args:
         db: Database session
         tags: List of tag names to search
         match_all: If True, document must have all tags. If False, document must have any tag.
-        skip: Number of records to skip
+        skip: Number of records to skip (ignored when a cursor is given)
         limit: Maximum number of records to return
-        
+        after_created_at: Keyset cursor - created_at of the last row seen
+        after_id: Keyset cursor - id of the last row seen
+
     Returns:
         List of Document models
     """
@@ -267,23 +420,28 @@ def search_documents_by_tags(
     if not tag_ids:
         return []
     
+    # Eager-load tags and the latest-version pointer so the response builders
+    # don't trigger one SELECT per document (N+1)
+    eager_options = (
+        joinedload(models.Document.latest_version),
+        selectinload(models.Document.tags)
+    )
+
     if match_all:
         # Document must have all tags
-        query = db.query(models.Document).join(models.document_tags).filter(
+        query = db.query(models.Document).options(*eager_options).join(models.document_tags).filter(
             models.document_tags.c.tag_id.in_(tag_ids)
         ).group_by(models.Document.id).having(
             func.count(models.document_tags.c.tag_id.distinct()) == len(tag_ids)
         )
     else:
         # Document must have any tag
-        query = db.query(models.Document).join(models.document_tags).filter(
+        query = db.query(models.Document).options(*eager_options).join(models.document_tags).filter(
             models.document_tags.c.tag_id.in_(tag_ids)
         ).distinct()
     
-    # Order by latest upload (most recent version)
-    query = query.order_by(models.Document.created_at.desc())
-    
-    return query.offset(skip).limit(limit).all()
+    # Order by latest upload and paginate (keyset when a cursor is given)
+    return _paginate_documents(query, skip, limit, after_created_at, after_id).all()
 
 
 def search_documents_advanced(
@@ -292,25 +450,35 @@ def search_documents_advanced(
     tags: Optional[List[str]] = None,
     file_type: Optional[str] = None,
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    after_created_at: Optional[datetime] = None,
+    after_id: Optional[int] = None
 ) -> List[models.Document]:
     """
     Advanced search with multiple filters.
-    
+
     Args:
         db: Database session
         query: Search query for title/description
         tags: List of tag names
         file_type: File type filter (pdf, docx, txt, etc.)
-        skip: Number of records to skip
+        skip: Number of records to skip (ignored when a cursor is given)
         limit: Maximum number of records to return
-        
+        after_created_at: Keyset cursor - created_at of the last row seen
+        after_id: Keyset cursor - id of the last row seen
+
     Returns:
         List of Document models
     """
-    db_query = db.query(models.Document)
-    
-    # Text search in title/description
+    db_query = db.query(models.Document).options(
+        joinedload(models.Document.latest_version),
+        selectinload(models.Document.tags)
+    )
+
+    # Text search in title/description. The leading wildcard makes this a
+    # sequential scan: SQLite has no trigram index, so the cost grows with
+    # the corpus. If title/description search outgrows a scan, move it to an
+    # FTS5 table (or pg_trgm GIN indexes when running on Postgres).
     if query:
         search_term = f"%{query.lower()}%"
         db_query = db_query.filter(
@@ -331,65 +499,64 @@ def search_documents_advanced(
                     models.document_tags.c.tag_id.in_(tag_ids)
                 ).distinct()
     
-    # File type filter (check latest version)
+    # File type filter (check latest version). The denormalized
+    # latest_version_id pointer identifies each document's current version
+    # directly, so this is a primary-key join plus a column filter - no
+    # window function or per-document subquery needed to find "the latest"
     if file_type:
         file_type_lower = file_type.lower().lstrip('.')
-        # Get document IDs where latest version has matching file type
-        # Subquery to get latest version for each document
-        latest_versions = db.query(
-            models.DocumentVersion.document_id,
-            func.max(models.DocumentVersion.version_number).label('max_version')
-        ).group_by(models.DocumentVersion.document_id).subquery()
-        
-        # Get document IDs with matching file type in latest version
-        doc_ids_with_type = db.query(models.DocumentVersion.document_id).join(
-            latest_versions,
+        db_query = db_query.join(
+            models.DocumentVersion,
             and_(
-                models.DocumentVersion.document_id == latest_versions.c.document_id,
-                models.DocumentVersion.version_number == latest_versions.c.max_version,
+                models.DocumentVersion.id == models.Document.latest_version_id,
                 models.DocumentVersion.file_type == file_type_lower
             )
-        ).distinct().subquery()
-        
-        db_query = db_query.filter(
-            models.Document.id.in_(db.query(doc_ids_with_type.c.document_id))
         )
     
-    # Order by latest upload
-    db_query = db_query.order_by(models.Document.created_at.desc())
-    
-    return db_query.offset(skip).limit(limit).all()
+    # Order by latest upload and paginate (keyset when a cursor is given)
+    return _paginate_documents(db_query, skip, limit, after_created_at, after_id).all()
 
 
 def delete_document(db: Session, document_id: int) -> bool:
     """
-    Deletes a document and all its versions.
-    
+    Deletes a document, its versions, and its tag associations.
+
+    Bulk DELETE statements remove the rows directly instead of loading every
+    version into the session for ORM cascade. Stored files are not touched
+    here; the router schedules their removal as a background task so the
+    response doesn't wait on filesystem I/O.
+
     Args:
         db: Database session
         document_id: Document ID
-        
+
     Returns:
         True if deleted successfully
-        
+
     Raises:
         HTTPException if document not found
     """
-    # Get document
-    document = db.query(models.Document).filter(models.Document.id == document_id).first()
-    if not document:
+    # Verify document exists without loading the full row
+    exists = db.query(models.Document.id).filter(
+        models.Document.id == document_id
+    ).first()
+    if not exists:
         raise HTTPException(status_code=404, detail="Document not found")
-    
-    # Delete files from storage
-    try:
-        delete_document_files(document_id)
-    except Exception as e:
-        # Log error but continue with database deletion
-        print(f"Warning: Failed to delete files for document {document_id}: {e}")
-    
-    # Delete document (cascade will delete versions and tag associations)
-    db.delete(document)
+
+    db.execute(
+        delete(models.document_tags).where(
+            models.document_tags.c.document_id == document_id
+        )
+    )
+    db.execute(
+        delete(models.DocumentVersion).where(
+            models.DocumentVersion.document_id == document_id
+        )
+    )
+    db.execute(
+        delete(models.Document).where(models.Document.id == document_id)
+    )
     db.commit()
-    
+
     return True
 
@@ -1,19 +1,43 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-import os
 
 # SQLite database URL
 SQLALCHEMY_DATABASE_URL = "sqlite:///./doc_manager.db"
 
 # Create engine
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, 
+    SQLALCHEMY_DATABASE_URL,
     connect_args={"check_same_thread": False}  # Needed for SQLite
 )
 
-# Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+@event.listens_for(engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Tune SQLite on every new connection: WAL lets readers proceed while a
+    writer commits, synchronous=NORMAL skips the per-commit fsync that WAL
+    makes safe to relax, and the remaining pragmas keep temp data and hot
+    pages in memory.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")  # 256MB
+    cursor.execute("PRAGMA cache_size=-65536")  # 64MB
+    cursor.close()
+
+# Create SessionLocal class. autoflush stays off so read-only endpoints never
+# pay a pending-state flush check on every query; write paths flush explicitly.
+# expire_on_commit stays off so attributes loaded before commit (ids, version
+# numbers) remain usable afterwards without a refetch.
+SessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+    bind=engine
+)
 
 # Create Base class for models
 Base = declarative_base()
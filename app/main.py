@@ -1,13 +1,17 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from app.db import init_db
 from app.routers import documents, search
 
-# Initialize FastAPI app
+# Initialize FastAPI app. orjson serializes responses several times faster
+# than stdlib json and handles datetimes natively, which matters most for
+# the list/search endpoints that return nested document lists.
 app = FastAPI(
     title="Knowledge Base & Document Management System",
     description="A system for uploading, storing, searching, and managing documents with version tracking",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware (allow all origins for development)
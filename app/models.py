@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Table, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, Table, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db import Base
@@ -8,7 +8,10 @@ document_tags = Table(
     'document_tags',
     Base.metadata,
     Column('document_id', Integer, ForeignKey('documents.id', ondelete='CASCADE'), primary_key=True),
-    Column('tag_id', Integer, ForeignKey('tags.id', ondelete='CASCADE'), primary_key=True)
+    Column('tag_id', Integer, ForeignKey('tags.id', ondelete='CASCADE'), primary_key=True),
+    # The composite primary key only seeks on a document_id prefix; tag
+    # searches filter on tag_id, so they need the reversed column order
+    Index('ix_document_tags_tag_id_document_id', 'tag_id', 'document_id')
 )
 
 
@@ -17,14 +20,37 @@ class Document(Base):
     Main document table - stores document identity (same across versions).
     """
     __tablename__ = "documents"
+    # Composite index backs keyset pagination ordered by (created_at, id)
+    __table_args__ = (
+        Index('ix_documents_created_at_id', 'created_at', 'id'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False, index=True)
     description = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    
+    # Denormalized pointer to the current latest version, maintained by the
+    # upload paths so list/search don't have to aggregate over all versions
+    latest_version_id = Column(
+        Integer,
+        ForeignKey('document_versions.id', use_alter=True, ondelete='SET NULL'),
+        nullable=True,
+        index=True
+    )
+    latest_version_number = Column(Integer, nullable=False, default=0, server_default='0')
+
     # Relationships
-    versions = relationship("DocumentVersion", back_populates="document", cascade="all, delete-orphan")
+    versions = relationship(
+        "DocumentVersion",
+        back_populates="document",
+        cascade="all, delete-orphan",
+        foreign_keys="DocumentVersion.document_id"
+    )
+    latest_version = relationship(
+        "DocumentVersion",
+        foreign_keys=[latest_version_id],
+        post_update=True
+    )
     tags = relationship("Tag", secondary=document_tags, back_populates="documents")
 
 
@@ -33,6 +59,12 @@ class DocumentVersion(Base):
     Document versions table - each upload creates a new version record.
     """
     __tablename__ = "document_versions"
+    # Composite index backs the per-document version lookups:
+    # WHERE document_id=? ORDER BY version_number DESC and MAX(version_number)
+    __table_args__ = (
+        Index('ix_document_versions_document_id_version_number',
+              'document_id', 'version_number'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     document_id = Column(Integer, ForeignKey('documents.id', ondelete='CASCADE'), nullable=False)
@@ -43,7 +75,7 @@ class DocumentVersion(Base):
     uploaded_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationship
-    document = relationship("Document", back_populates="versions")
+    document = relationship("Document", back_populates="versions", foreign_keys=[document_id])
 
 
 class Tag(Base):
@@ -53,7 +85,10 @@ class Tag(Base):
     __tablename__ = "tags"
 
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String(100), unique=True, nullable=False, index=True)
+    # NOCASE collation makes the unique index and name lookups
+    # case-insensitive at the DB level; application code still stores the
+    # canonical lowercase form for display
+    name = Column(String(100, collation='NOCASE'), unique=True, nullable=False, index=True)
     
     # Relationship
     documents = relationship("Document", secondary=document_tags, back_populates="tags")
@@ -1,19 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, Response
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile, File, Form, Query
 from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 from typing import Optional, List
-from pathlib import Path
-import os
+from datetime import datetime
+import mimetypes
 
 from app import crud, schemas
 from app.db import get_db
-from app.storage import get_file_path
+from app.storage import get_file_path, delete_document_files
 
 router = APIRouter(prefix="/documents", tags=["documents"])
 
+# Media types for inline preview, built once at import time
+_MEDIA_TYPE_MAP = {
+    '.pdf': 'application/pdf',
+    '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    '.doc': 'application/msword',
+    '.txt': 'text/plain'
+}
+
 
 @router.post("/upload", response_model=schemas.DocumentUploadResponse)
-async def upload_document(
+def upload_document(
     title: str = Form(...),
     description: Optional[str] = Form(None),
     tags: Optional[str] = Form(None),
@@ -29,8 +37,12 @@ async def upload_document(
     - **tags**: Comma-separated tags (optional)
     - **file**: Document file (PDF, DOCX, TXT, DOC)
     - **document_id**: If provided, adds new version to existing document (optional)
-    
+
     Returns document_id and version_number.
+
+    Declared sync on purpose: the CRUD/storage chain does blocking disk and
+    DB I/O, so FastAPI runs this handler in its threadpool and concurrent
+    uploads proceed in parallel instead of serializing on the event loop.
     """
     if document_id:
         # Add new version to existing document
@@ -57,27 +69,41 @@ async def upload_document(
 def list_documents(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    after_created_at: Optional[datetime] = Query(None, description="Keyset cursor: created_at of the last document seen"),
+    after_id: Optional[int] = Query(None, description="Keyset cursor: id of the last document seen"),
     db: Session = Depends(get_db)
 ):
     """
     List all documents with their latest version and tags.
-    
-    - **skip**: Number of records to skip (pagination)
+
+    Results are ordered by created_at (newest first). For deep pagination,
+    pass the last document's created_at/id as after_created_at/after_id
+    instead of skip - the keyset cursor seeks directly instead of scanning
+    and discarding skipped rows.
+
+    - **skip**: Number of records to skip (ignored when a cursor is given)
     - **limit**: Maximum number of records to return
+    - **after_created_at**: Keyset cursor (use with after_id)
+    - **after_id**: Keyset cursor (use with after_created_at)
     """
-    documents = crud.get_documents(db=db, skip=skip, limit=limit)
-    
+    rows = crud.get_documents(
+        db=db,
+        skip=skip,
+        limit=limit,
+        after_created_at=after_created_at,
+        after_id=after_id
+    )
+
     result = []
-    for doc in documents:
-        # Get latest version
+    for doc, latest, version_count in rows:
+        # Latest version comes pre-resolved from the aggregate query
         latest_version = None
-        if doc.versions:
-            latest = max(doc.versions, key=lambda v: v.version_number)
+        if latest:
             latest_version = schemas.DocumentVersionResponse.model_validate(latest)
-        
+
         # Get tags
-        tags = [schemas.TagResponse.model_validate(tag) for tag in doc.tags]
-        
+        tags = schemas.tag_list_adapter.validate_python(doc.tags, from_attributes=True)
+
         result.append(schemas.DocumentResponse(
             id=doc.id,
             title=doc.title,
@@ -85,9 +111,9 @@ def list_documents(
             created_at=doc.created_at,
             latest_version=latest_version,
             tags=tags,
-            version_count=len(doc.versions)
+            version_count=version_count
         ))
-    
+
     return result
 
 
@@ -134,18 +160,14 @@ def download_document(
     if not file_path or not file_path.exists():
         raise HTTPException(status_code=404, detail="File not found")
     
-    # Determine filename for download
-    if version:
-        filename = f"{document.title}_v{version}{file_path.suffix}"
+    # Determine filename for download; the latest version number is already on
+    # the fetched Document row, so no extra query is needed
+    version_number = version or document.latest_version_number
+    if version_number:
+        filename = f"{document.title}_v{version_number}{file_path.suffix}"
     else:
-        # Get latest version number
-        versions = crud.get_document_versions(db=db, document_id=document_id)
-        if versions and versions.versions:
-            latest_v = max(versions.versions, key=lambda v: v.version_number)
-            filename = f"{document.title}_v{latest_v.version_number}{file_path.suffix}"
-        else:
-            filename = f"{document.title}{file_path.suffix}"
-    
+        filename = f"{document.title}{file_path.suffix}"
+
     return FileResponse(
         path=str(file_path),
         filename=filename,
@@ -178,55 +200,45 @@ def preview_document(
     if not file_path or not file_path.exists():
         raise HTTPException(status_code=404, detail="File not found")
     
-    # Determine media type based on file extension
-    file_ext = file_path.suffix.lower()
-    media_type_map = {
-        '.pdf': 'application/pdf',
-        '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-        '.doc': 'application/msword',
-        '.txt': 'text/plain'
-    }
-    media_type = media_type_map.get(file_ext, 'application/octet-stream')
-    
-    # Determine filename
-    if version:
-        filename = f"{document.title}_v{version}{file_path.suffix}"
+    # Determine media type based on file extension, falling back to the
+    # mimetypes registry for anything outside the precomputed map
+    media_type = _MEDIA_TYPE_MAP.get(file_path.suffix.lower())
+    if media_type is None:
+        media_type = mimetypes.guess_type(file_path.name)[0] or 'application/octet-stream'
+    
+    # Determine filename; the latest version number is already on the fetched
+    # Document row, so no extra query is needed
+    version_number = version or document.latest_version_number
+    if version_number:
+        filename = f"{document.title}_v{version_number}{file_path.suffix}"
     else:
-        # Get latest version number
-        versions = crud.get_document_versions(db=db, document_id=document_id)
-        if versions and versions.versions:
-            latest_v = max(versions.versions, key=lambda v: v.version_number)
-            filename = f"{document.title}_v{latest_v.version_number}{file_path.suffix}"
-        else:
-            filename = f"{document.title}{file_path.suffix}"
-    
-    # Read file content
-    with open(file_path, 'rb') as f:
-        file_content = f.read()
-    
-    # Return with inline content disposition for preview
-    return Response(
-        content=file_content,
+        filename = f"{document.title}{file_path.suffix}"
+    
+    # Stream the file with inline content disposition for preview; FileResponse
+    # hands the fd to the server instead of loading the file into memory
+    return FileResponse(
+        path=str(file_path),
         media_type=media_type,
-        headers={
-            "Content-Disposition": f'inline; filename="{filename}"',
-            "Content-Type": media_type
-        }
+        filename=filename,
+        content_disposition_type="inline"
     )
 
 
 @router.delete("/{document_id}", status_code=200)
 def delete_document(
     document_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """
     Delete a document and all its versions.
-    
+
     - **document_id**: Document ID to delete
-    
-    Returns success message.
+
+    Returns success message. Stored files are removed in the background after
+    the response is sent.
     """
     crud.delete_document(db=db, document_id=document_id)
+    background_tasks.add_task(delete_document_files, document_id)
     return {"message": f"Document {document_id} deleted successfully"}
 
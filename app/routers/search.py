@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Optional
+from datetime import datetime
 
 from app import crud, schemas
 from app.db import get_db
@@ -16,18 +17,22 @@ def search_documents(
     file_type: Optional[str] = Query(None, description="Filter by file type (pdf, docx, txt, etc.)"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    after_created_at: Optional[datetime] = Query(None, description="Keyset cursor: created_at of the last document seen"),
+    after_id: Optional[int] = Query(None, description="Keyset cursor: id of the last document seen"),
     db: Session = Depends(get_db)
 ):
     """
     Search documents with multiple filters.
-    
+
     - **tags**: Comma-separated tags to search (e.g., 'invoice,policy')
     - **match_all**: If True, document must have all specified tags
     - **query**: Search term for title and description
     - **file_type**: Filter by file type (pdf, docx, txt, doc)
-    - **skip**: Number of records to skip (pagination)
+    - **skip**: Number of records to skip (ignored when a cursor is given)
     - **limit**: Maximum number of records to return
-    
+    - **after_created_at** / **after_id**: Keyset cursor from the previous
+      page's next_cursor; scales better than skip for deep pages
+
     Examples:
     - Search by tags: `/documents/search?tags=invoice,policy`
     - Search by text: `/documents/search?query=policy`
@@ -37,7 +42,11 @@ def search_documents(
     tag_list = None
     if tags:
         tag_list = [tag.strip() for tag in tags.split(',') if tag.strip()]
-    
+
+    # Fetch one row beyond the page: its presence tells us whether another
+    # page exists without running a COUNT over the filtered set
+    fetch_limit = limit + 1
+
     # Determine search method
     if tag_list and not query and not file_type:
         # Simple tag search
@@ -46,7 +55,9 @@ def search_documents(
             tags=tag_list,
             match_all=match_all,
             skip=skip,
-            limit=limit
+            limit=fetch_limit,
+            after_created_at=after_created_at,
+            after_id=after_id
         )
     else:
         # Advanced search
@@ -56,21 +67,26 @@ def search_documents(
             tags=tag_list,
             file_type=file_type,
             skip=skip,
-            limit=limit
+            limit=fetch_limit,
+            after_created_at=after_created_at,
+            after_id=after_id
         )
-    
+
+    has_more = len(documents) > limit
+    if has_more:
+        documents = documents[:limit]
+
     # Format response
     result = []
     for doc in documents:
-        # Get latest version
+        # Latest version comes from the denormalized pointer (eager-loaded)
         latest_version = None
-        if doc.versions:
-            latest = max(doc.versions, key=lambda v: v.version_number)
-            latest_version = schemas.DocumentVersionResponse.model_validate(latest)
-        
+        if doc.latest_version:
+            latest_version = schemas.DocumentVersionResponse.model_validate(doc.latest_version)
+
         # Get tags
-        tag_responses = [schemas.TagResponse.model_validate(tag) for tag in doc.tags]
-        
+        tag_responses = schemas.tag_list_adapter.validate_python(doc.tags, from_attributes=True)
+
         result.append(schemas.DocumentResponse(
             id=doc.id,
             title=doc.title,
@@ -78,11 +94,19 @@ def search_documents(
             created_at=doc.created_at,
             latest_version=latest_version,
             tags=tag_responses,
-            version_count=len(doc.versions)
+            version_count=doc.latest_version_number
         ))
     
+    # Provide a keyset cursor only when another page actually exists
+    next_cursor = None
+    if has_more:
+        last = documents[-1]
+        next_cursor = schemas.PageCursor(created_at=last.created_at, id=last.id)
+
     return schemas.SearchResponse(
         documents=result,
-        total=len(result)
+        total=len(result),
+        has_more=has_more,
+        next_cursor=next_cursor
     )
 
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 from typing import List, Optional
 from datetime import datetime
 
@@ -26,6 +26,12 @@ class DocumentVersionResponse(BaseModel):
         from_attributes = True
 
 
+# List adapters built once at import time: validating a whole collection
+# through these is cheaper than calling model_validate per item
+tag_list_adapter = TypeAdapter(List[TagResponse])
+version_list_adapter = TypeAdapter(List[DocumentVersionResponse])
+
+
 class DocumentBase(BaseModel):
     title: str = Field(..., min_length=1, max_length=255)
     description: Optional[str] = None
@@ -64,7 +70,15 @@ class DocumentVersionsResponse(BaseModel):
         from_attributes = True
 
 
+class PageCursor(BaseModel):
+    """Keyset-pagination cursor: pass these back as after_created_at/after_id."""
+    created_at: datetime
+    id: int
+
+
 class SearchResponse(BaseModel):
     documents: List[DocumentResponse]
     total: int
+    has_more: bool = False
+    next_cursor: Optional[PageCursor] = None
 
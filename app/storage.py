@@ -1,27 +1,77 @@
 import os
+import re
+import stat
+import threading
 import uuid
-import shutil
 from pathlib import Path
 from typing import Tuple, Optional
 from fastapi import UploadFile, HTTPException
-import mimetypes
 
 # Configuration
-ALLOWED_EXTENSIONS = {'.pdf', '.docx', '.txt', '.doc'}
+# Single source of truth for what uploads are accepted: extension -> the MIME
+# type that extension is expected to arrive with. Everything else (the
+# extension set, the MIME lookup and the error strings) derives from it once
+# at import time, so validation is a pair of dict operations per upload.
+_EXT_TO_MIME = {
+    '.pdf': 'application/pdf',
+    '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    '.doc': 'application/msword',
+    '.txt': 'text/plain'
+}
+ALLOWED_EXTENSIONS = frozenset(_EXT_TO_MIME)
+_ALLOWED_EXT_STR = ', '.join(sorted(ALLOWED_EXTENSIONS))
+_ALLOWED_MIME_TYPES = {mime: ext for ext, mime in _EXT_TO_MIME.items()}
+_ALLOWED_MIMES_STR = ', '.join(_ALLOWED_MIME_TYPES)
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB in bytes
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB per read when streaming uploads to disk
 STORAGE_BASE = Path("storage/docs")
 
+# Parses the version number out of "v<n>_<uuid><ext>" filenames
+_VERSION_RE = re.compile(r'^v(\d+)_')
+
+# Magic bytes the file content must start with, per extension. Plain-text
+# formats (.txt) and legacy .doc have no reliable signature and are skipped.
+_MAGIC_SIGNATURES = {
+    '.pdf': b'%PDF-',
+    '.docx': b'PK\x03\x04'
+}
+
 
 def get_allowed_mime_types() -> dict:
     """
     Returns dictionary of allowed MIME types.
     """
-    return {
-        'application/pdf': '.pdf',
-        'application/vnd.openxmlformats-officedocument.wordprocessingml.document': '.docx',
-        'application/msword': '.doc',
-        'text/plain': '.txt'
-    }
+    return _ALLOWED_MIME_TYPES
+
+
+# Document directories known to exist, keyed by path so entries stay valid
+# even if STORAGE_BASE is repointed (as the tests do). Saves the stat+mkdir
+# syscalls on every repeat upload to the same document.
+_ensured_dirs = set()
+_ensured_dirs_lock = threading.Lock()
+
+
+def _unlink_quiet(path: str) -> None:
+    """
+    Removes a file, ignoring it already being gone.
+    """
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _ensure_document_dir(doc_path: Path) -> None:
+    """
+    Creates the document directory if this process hasn't confirmed it yet.
+    """
+    key = str(doc_path)
+    with _ensured_dirs_lock:
+        if key in _ensured_dirs:
+            return
+    doc_path.mkdir(parents=True, exist_ok=True)
+    with _ensured_dirs_lock:
+        _ensured_dirs.add(key)
 
 
 def validate_file(file: UploadFile) -> Tuple[str, str]:
@@ -41,28 +91,30 @@ def validate_file(file: UploadFile) -> Tuple[str, str]:
     if not file.filename:
         raise HTTPException(status_code=400, detail="No file provided")
     
-    # Get file extension
-    file_ext = Path(file.filename).suffix.lower()
-    
-    # Validate extension
-    if file_ext not in ALLOWED_EXTENSIONS:
+    # Get file extension without building a Path object per upload
+    dot = file.filename.rfind('.')
+    file_ext = file.filename[dot:].lower() if dot >= 0 else ''
+
+    # Validate extension and MIME type against the combined table: one lookup
+    # resolves both the allow-list check and the MIME type the extension is
+    # expected to carry, which also rejects mismatched pairs (e.g. a .pdf
+    # arriving as text/plain) that two independent membership checks let through
+    expected_mime = _EXT_TO_MIME.get(file_ext)
+    if expected_mime is None:
         raise HTTPException(
-            status_code=400, 
-            detail=f"File type not allowed. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
+            status_code=400,
+            detail=f"File type not allowed. Allowed types: {_ALLOWED_EXT_STR}"
+        )
+    if file.content_type and file.content_type != expected_mime:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid MIME type '{file.content_type}' for {file_ext} file. Expected: {expected_mime}"
         )
     
-    # Validate MIME type
-    if file.content_type:
-        allowed_mimes = get_allowed_mime_types()
-        if file.content_type not in allowed_mimes:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid MIME type. Allowed types: {', '.join(allowed_mimes.keys())}"
-            )
-    
-    # Generate safe filename using UUID
-    safe_filename = f"{uuid.uuid4()}{file_ext}"
-    
+    # Generate safe filename using UUID; .hex skips the hyphenated
+    # str(UUID) formatting and keeps the name shorter
+    safe_filename = uuid.uuid4().hex + file_ext
+
     return file_ext, safe_filename
 
 
@@ -115,39 +167,74 @@ def save_file(file: UploadFile, document_id: int, version_number: int) -> Tuple[
     # Validate file
     file_ext, safe_filename = validate_file(file)
     
-    # Create document storage directory
+    # Create document storage directory (skipped once known to exist)
     doc_path = get_document_storage_path(document_id)
-    doc_path.mkdir(parents=True, exist_ok=True)
-    
-    # Create versioned filename
-    version_filename = f"v{version_number}_{safe_filename}"
-    file_path = doc_path / version_filename
-    
-    # Validate file size by reading content
-    file_content = file.file.read()
-    file_size = len(file_content)
-    validate_file_size(file_size)
-    
-    # Reset file pointer
-    file.file.seek(0)
+    _ensure_document_dir(doc_path)
     
-    # Save file
+    # Build the destination as a plain string: the stored file_path is a
+    # string anyway, so Path arithmetic plus the relative_to() walk at the
+    # end would be pure allocation overhead (str(Path) is cached, so this
+    # formats without re-joining the parts)
+    file_path = f"{doc_path}{os.sep}v{version_number}_{safe_filename}"
+
+    # Sniff the magic bytes before anything touches disk: extension and MIME
+    # type are caller-controlled, the leading bytes are not. Rejecting here
+    # means a mislabelled upload costs one small read instead of a full write
+    # plus the cleanup unlink.
+    src = file.file
+    signature = _MAGIC_SIGNATURES.get(file_ext)
+    if signature is not None:
+        head = src.read(len(signature))
+        src.seek(0)
+        if head != signature:
+            raise HTTPException(
+                status_code=400,
+                detail=f"File content does not match {file_ext} format"
+            )
+
+    # Large uploads spill from the spooled buffer to a real temp file; in that
+    # case os.sendfile copies kernel-to-kernel without bouncing every byte
+    # through Python. In-memory uploads take the chunked fallback below.
+    spilled_fd = None
+    if getattr(src, "_rolled", False) and hasattr(src, "fileno"):
+        fd = src.fileno()
+        if stat.S_ISREG(os.fstat(fd).st_mode):
+            spilled_fd = fd
+
+    # Stream to disk so the upload is never fully materialized in memory; the
+    # size limit is enforced before (sendfile) or as (chunked) bytes move
+    file_size = 0
     try:
         with open(file_path, "wb") as f:
-            shutil.copyfileobj(file.file, f)
+            if spilled_fd is not None and hasattr(os, "sendfile"):
+                total = os.fstat(spilled_fd).st_size
+                validate_file_size(total)
+                while file_size < total:
+                    sent = os.sendfile(
+                        f.fileno(), spilled_fd, file_size, total - file_size
+                    )
+                    if sent == 0:
+                        break
+                    file_size += sent
+            else:
+                while chunk := src.read(UPLOAD_CHUNK_SIZE):
+                    file_size += len(chunk)
+                    validate_file_size(file_size)
+                    f.write(chunk)
+    except HTTPException:
+        # Remove the partially written file before propagating (e.g. too large)
+        _unlink_quiet(file_path)
+        raise
     except Exception as e:
+        _unlink_quiet(file_path)
         raise HTTPException(
             status_code=500,
             detail=f"Failed to save file: {str(e)}"
         )
-    
-    # Return relative path as string (or absolute if not under current dir)
-    try:
-        relative_path = str(file_path.relative_to(Path(".")))
-    except ValueError:
-        # If path is not under current directory (e.g., temp dir), use absolute path
-        relative_path = str(file_path)
-    return relative_path, file_size
+
+    # Already relative when STORAGE_BASE is relative, absolute otherwise -
+    # the same contract the old relative_to() dance produced
+    return file_path, file_size
 
 
 def get_file_path(document_id: int, version_number: Optional[int] = None) -> Optional[Path]:
@@ -162,24 +249,34 @@ def get_file_path(document_id: int, version_number: Optional[int] = None) -> Opt
         Path object if file exists, None otherwise
     """
     doc_path = get_document_storage_path(document_id)
-    
-    if not doc_path.exists():
+
+    # Single scandir pass instead of pathlib glob + sort: no Path objects are
+    # built for losing entries and each name is parsed at most once
+    try:
+        with os.scandir(doc_path) as entries:
+            if version_number:
+                # Find specific version file
+                prefix = f"v{version_number}_"
+                for entry in entries:
+                    if entry.name.startswith(prefix):
+                        return Path(entry.path)
+            else:
+                # Get latest version (highest version number)
+                best_num = -1
+                best_path = None
+                for entry in entries:
+                    match = _VERSION_RE.match(entry.name)
+                    if not match:
+                        continue
+                    num = int(match.group(1))
+                    if num > best_num:
+                        best_num = num
+                        best_path = entry.path
+                if best_path is not None:
+                    return Path(best_path)
+    except FileNotFoundError:
         return None
-    
-    if version_number:
-        # Find specific version file
-        pattern = f"v{version_number}_*"
-        matching_files = list(doc_path.glob(pattern))
-        if matching_files:
-            return matching_files[0]
-    else:
-        # Get latest version (highest version number)
-        version_files = list(doc_path.glob("v*_*"))
-        if version_files:
-            # Sort by version number (extract from filename)
-            version_files.sort(key=lambda x: int(x.stem.split('_')[0][1:]) if x.stem.split('_')[0][1:].isdigit() else 0, reverse=True)
-            return version_files[0]
-    
+
     return None
 
 
@@ -191,21 +288,39 @@ def delete_document_files(document_id: int) -> None:
         document_id: Document ID
     """
     doc_path = get_document_storage_path(document_id)
-    if doc_path.exists():
-        shutil.rmtree(doc_path)
+    with _ensured_dirs_lock:
+        _ensured_dirs.discard(str(doc_path))
+    # The layout is flat (one directory of version files per document), so a
+    # scandir + unlink loop beats shutil.rmtree's per-entry lstat walk
+    try:
+        with os.scandir(doc_path) as entries:
+            for entry in entries:
+                os.unlink(entry.path)
+        os.rmdir(doc_path)
+    except FileNotFoundError:
+        pass
+
+
+# Known extensions resolved to their file type up front; the upload path
+# always passes the lowercased dotted suffix, so this is one dict hit
+_FILE_TYPE_BY_EXT = {ext: ext.lstrip('.') for ext in _EXT_TO_MIME}
 
 
 def get_file_type_from_extension(extension: str) -> str:
     """
     Gets file type string from extension.
-    
+
     Args:
         extension: File extension (e.g., '.pdf')
-        
+
     Returns:
         File type string (e.g., 'pdf')
     """
-    return extension.lstrip('.').lower()
+    file_type = _FILE_TYPE_BY_EXT.get(extension)
+    if file_type is None:
+        # Unknown or unnormalized form (e.g. '.PDF', 'pdf'): normalize as before
+        file_type = extension.lstrip('.').lower()
+    return file_type
 
 
 # Initialize storage directory
@@ -213,7 +213,11 @@ class TestGetDocuments:
         """Test getting documents."""
         result = crud.get_documents(db_session)
         assert len(result) == 1
-        assert result[0].id == sample_document.id
+
+        document, latest_version, version_count = result[0]
+        assert document.id == sample_document.id
+        assert latest_version.version_number == 1
+        assert version_count == 1
     
     def test_get_documents_pagination(self, db_session):
         """Test pagination."""
@@ -374,29 +378,26 @@ class TestSearchDocumentsAdvanced:
 class TestDeleteDocument:
     """Tests for delete_document function."""
     
-    @patch('app.crud.delete_document_files')
-    def test_delete_existing_document(self, mock_delete_files, db_session, sample_document):
+    def test_delete_existing_document(self, db_session, sample_document):
         """Test deleting an existing document."""
         doc_id = sample_document.id
-        
+
         result = crud.delete_document(db_session, doc_id)
-        
+
         assert result is True
-        mock_delete_files.assert_called_once_with(doc_id)
-        
+
         # Verify document is deleted
         deleted = db_session.query(models.Document).filter(
             models.Document.id == doc_id
         ).first()
         assert deleted is None
-    
-    @patch('app.crud.delete_document_files')
-    def test_delete_document_cascades_versions(self, mock_delete_files, db_session, sample_document_multiple_versions):
+
+    def test_delete_document_cascades_versions(self, db_session, sample_document_multiple_versions):
         """Test that deleting document also deletes versions."""
         doc_id = sample_document_multiple_versions.id
-        
+
         crud.delete_document(db_session, doc_id)
-        
+
         # Verify versions are deleted
         versions = db_session.query(models.DocumentVersion).filter(
             models.DocumentVersion.document_id == doc_id
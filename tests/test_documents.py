@@ -6,19 +6,23 @@ from io import BytesIO
 class TestUploadDocument:
     """Tests for POST /documents/upload endpoint."""
     
-    def test_upload_new_document(self, client, temp_storage):
+    def test_upload_new_document(self, client, temp_storage, build_multipart):
         """Test uploading a new document."""
-        file_content = b"Test PDF content"
-        files = {
-            "file": ("test_document.pdf", BytesIO(file_content), "application/pdf")
-        }
-        data = {
-            "title": "Test Document",
-            "description": "Test description",
-            "tags": "invoice, policy"
-        }
-        
-        response = client.post("/documents/upload", files=files, data=data)
+        # Raw pre-built body: skips the client-side multipart encoder while
+        # still exercising the server's parse path
+        body, content_type = build_multipart(
+            {
+                "title": "Test Document",
+                "description": "Test description",
+                "tags": "invoice, policy"
+            },
+            "test_document.pdf",
+            b"%PDF-1.4 test PDF content"
+        )
+
+        response = client.post(
+            "/documents/upload", content=body, headers={"content-type": content_type}
+        )
         
         assert response.status_code == 200
         result = response.json()
@@ -66,7 +70,7 @@ class TestUploadDocument:
     
     def test_upload_new_version(self, client, temp_storage, sample_document):
         """Test uploading a new version to existing document."""
-        file_content = b"New version content"
+        file_content = b"%PDF-1.4 new version content"
         files = {
             "file": ("v2.pdf", BytesIO(file_content), "application/pdf")
         }
@@ -103,14 +107,10 @@ class TestListDocuments:
         assert data[0]["id"] == sample_document.id
         assert data[0]["title"] == sample_document.title
     
-    def test_list_documents_pagination(self, client):
+    def test_list_documents_pagination(self, client, seed_documents):
         """Test pagination parameters."""
-        # Create multiple documents
-        for i in range(5):
-            file_content = b"Content"
-            files = {"file": (f"doc{i}.pdf", BytesIO(file_content), "application/pdf")}
-            data = {"title": f"Document {i}"}
-            client.post("/documents/upload", files=files, data=data)
+        # Seed multiple documents directly - the upload path isn't under test
+        seed_documents([{"title": f"Document {i}"} for i in range(5)])
         
         # Test pagination
         response = client.get("/documents?skip=2&limit=2")
@@ -154,88 +154,53 @@ class TestGetVersions:
         assert "not found" in response.json()["detail"].lower()
 
 
-class TestDownloadDocument:
-    """Tests for GET /documents/{document_id}/download endpoint."""
-    
-    def test_download_latest_version(self, client, temp_storage, sample_document):
-        """Test downloading latest version of document."""
-        # Create actual file for download
-        doc_path = temp_storage / "docs" / str(sample_document.id)
-        doc_path.mkdir(parents=True, exist_ok=True)
-        test_file = doc_path / "v1_test.pdf"
-        test_file.write_bytes(b"PDF content for download")
-        
-        response = client.get(f"/documents/{sample_document.id}/download")
-        
-        assert response.status_code == 200
-        assert response.headers["content-type"] == "application/octet-stream"
-        assert b"PDF content" in response.content
-    
-    def test_download_specific_version(self, client, temp_storage, sample_document_multiple_versions):
-        """Test downloading specific version."""
-        # Create actual files
-        doc_path = temp_storage / "docs" / str(sample_document_multiple_versions.id)
-        doc_path.mkdir(parents=True, exist_ok=True)
-        (doc_path / "v2_test.pdf").write_bytes(b"Version 2 content")
-        
-        response = client.get(
-            f"/documents/{sample_document_multiple_versions.id}/download?version=2"
-        )
-        
-        assert response.status_code == 200
-        assert b"Version 2" in response.content
-    
-    def test_download_nonexistent_document(self, client):
-        """Test downloading non-existent document."""
-        response = client.get("/documents/99999/download")
-        
-        assert response.status_code == 404
-    
-    def test_download_nonexistent_version(self, client, temp_storage, sample_document):
-        """Test downloading non-existent version."""
-        # Create file for v1 but request v5
-        doc_path = temp_storage / "docs" / str(sample_document.id)
+class TestFileEndpoints:
+    """
+    Tests for the GET /documents/{document_id}/download and /preview
+    endpoints. The two endpoints share the same version-resolution matrix,
+    so the cases are parametrized over (endpoint, version) instead of
+    duplicating near-identical methods per endpoint.
+    """
+
+    @pytest.fixture
+    def served_document(self, temp_storage, sample_document_multiple_versions):
+        """Create the version files on disk for the multi-version document."""
+        doc = sample_document_multiple_versions
+        doc_path = temp_storage / "docs" / str(doc.id)
         doc_path.mkdir(parents=True, exist_ok=True)
-        (doc_path / "v1_test.pdf").write_bytes(b"Content")
-        
-        response = client.get(f"/documents/{sample_document.id}/download?version=5")
-        
-        assert response.status_code == 404
+        for v in (1, 2, 3):
+            (doc_path / f"v{v}_test.pdf").write_bytes(f"Version {v} content".encode())
+        return doc
 
+    @pytest.mark.parametrize("endpoint", ["download", "preview"])
+    @pytest.mark.parametrize("version,status", [
+        (None, 200),  # latest version
+        (2, 200),     # explicit existing version
+        (5, 404),     # version that does not exist
+    ])
+    def test_fetch_version(self, client, served_document, endpoint, version, status):
+        """Test fetching latest, specific and missing versions."""
+        url = f"/documents/{served_document.id}/{endpoint}"
+        if version is not None:
+            url += f"?version={version}"
+
+        response = client.get(url)
+
+        assert response.status_code == status
+        if status == 200:
+            expected_version = version or 3
+            assert f"Version {expected_version}".encode() in response.content
+            if endpoint == "download":
+                assert response.headers["content-type"] == "application/octet-stream"
+            else:
+                assert "application/pdf" in response.headers["content-type"]
+                assert "inline" in response.headers["content-disposition"]
+
+    @pytest.mark.parametrize("endpoint", ["download", "preview"])
+    def test_fetch_nonexistent_document(self, client, endpoint):
+        """Test fetching a document that does not exist."""
+        response = client.get(f"/documents/99999/{endpoint}")
 
-class TestPreviewDocument:
-    """Tests for GET /documents/{document_id}/preview endpoint."""
-    
-    def test_preview_latest_version(self, client, temp_storage, sample_document):
-        """Test previewing latest version."""
-        # Create actual file
-        doc_path = temp_storage / "docs" / str(sample_document.id)
-        doc_path.mkdir(parents=True, exist_ok=True)
-        (doc_path / "v1_test.pdf").write_bytes(b"PDF preview content")
-        
-        response = client.get(f"/documents/{sample_document.id}/preview")
-        
-        assert response.status_code == 200
-        assert "application/pdf" in response.headers["content-type"]
-        assert "inline" in response.headers["content-disposition"]
-    
-    def test_preview_specific_version(self, client, temp_storage, sample_document_multiple_versions):
-        """Test previewing specific version."""
-        doc_path = temp_storage / "docs" / str(sample_document_multiple_versions.id)
-        doc_path.mkdir(parents=True, exist_ok=True)
-        (doc_path / "v2_test.pdf").write_bytes(b"Version 2 preview")
-        
-        response = client.get(
-            f"/documents/{sample_document_multiple_versions.id}/preview?version=2"
-        )
-        
-        assert response.status_code == 200
-        assert "inline" in response.headers["content-disposition"]
-    
-    def test_preview_nonexistent_document(self, client):
-        """Test previewing non-existent document."""
-        response = client.get("/documents/99999/preview")
-        
         assert response.status_code == 404
 
 
@@ -16,7 +16,7 @@ class TestCompleteDocumentWorkflow:
     def test_complete_document_lifecycle(self, client, temp_storage, db_session):
         """Test complete workflow: upload -> list -> get versions -> download -> delete."""
         # 1. Upload a new document
-        file_content = b"Initial PDF content for integration test"
+        file_content = b"%PDF-1.4 initial content for integration test"
         files = {
             "file": ("integration_test.pdf", BytesIO(file_content), "application/pdf")
         }
@@ -32,11 +32,12 @@ class TestCompleteDocumentWorkflow:
         document_id = upload_result["document_id"]
         assert upload_result["version_number"] == 1
         
-        # Verify file was saved
-        doc_path = temp_storage / "docs" / str(document_id)
-        assert doc_path.exists()
-        version_files = list(doc_path.glob("v1_*"))
-        assert len(version_files) == 1
+        # Verify file was saved: the version row records the exact path, so a
+        # single stat replaces a directory glob scan
+        v1 = db_session.query(models.DocumentVersion).filter_by(
+            document_id=document_id, version_number=1
+        ).one()
+        assert Path(v1.file_path).is_file()
         
         # 2. List documents and verify it appears
         list_response = client.get("/documents")
@@ -62,7 +63,7 @@ class TestCompleteDocumentWorkflow:
         assert file_content in download_response.content
         
         # 5. Upload a new version
-        new_file_content = b"Updated PDF content - version 2"
+        new_file_content = b"%PDF-1.4 updated content - version 2"
         files_v2 = {
             "file": ("integration_test_v2.pdf", BytesIO(new_file_content), "application/pdf")
         }
@@ -82,9 +83,12 @@ class TestCompleteDocumentWorkflow:
         versions_data = versions_response.json()
         assert len(versions_data["versions"]) == 2
         
-        # Verify file system has both versions
-        version_files = list(doc_path.glob("v*_*"))
-        assert len(version_files) == 2
+        # Verify file system has both versions via their recorded paths
+        v2 = db_session.query(models.DocumentVersion).filter_by(
+            document_id=document_id, version_number=2
+        ).one()
+        assert Path(v1.file_path).is_file()
+        assert Path(v2.file_path).is_file()
         
         # 6. Download specific version
         download_v1_response = client.get(f"/documents/{document_id}/download?version=1")
@@ -111,23 +115,16 @@ class TestCompleteDocumentWorkflow:
 class TestSearchAndFilterWorkflow:
     """Test search and filtering workflows across multiple documents."""
     
-    def test_search_workflow_with_multiple_documents(self, client, temp_storage):
-        """Test creating multiple documents and searching/filtering them."""
-        # Create multiple documents with different tags and types
-        documents_data = [
-            {"title": "Invoice Policy", "tags": "invoice, policy", "file": "invoice.pdf", "content": b"Invoice content"},
-            {"title": "HR Handbook", "tags": "hr, policy", "file": "hr.pdf", "content": b"HR content"},
-            {"title": "Technical Manual", "tags": "technical, docs", "file": "manual.pdf", "content": b"Technical content"},
-            {"title": "Invoice Template", "tags": "invoice, template", "file": "template.pdf", "content": b"Template content"},
-        ]
-        
-        created_ids = []
-        for doc_data in documents_data:
-            files = {"file": (doc_data["file"], BytesIO(doc_data["content"]), "application/pdf")}
-            data = {"title": doc_data["title"], "tags": doc_data["tags"]}
-            response = client.post("/documents/upload", files=files, data=data)
-            assert response.status_code == 200
-            created_ids.append(response.json()["document_id"])
+    def test_search_workflow_with_multiple_documents(self, client, seed_documents):
+        """Test searching/filtering across multiple seeded documents."""
+        # Seed documents with different tags directly - search is under test,
+        # not the upload path
+        created_ids = seed_documents([
+            {"title": "Invoice Policy", "tags": ["invoice", "policy"]},
+            {"title": "HR Handbook", "tags": ["hr", "policy"]},
+            {"title": "Technical Manual", "tags": ["technical", "docs"]},
+            {"title": "Invoice Template", "tags": ["invoice", "template"]},
+        ])
         
         # Search by single tag
         response = client.get("/documents/search?tags=invoice")
@@ -175,13 +172,13 @@ class TestTagManagementWorkflow:
     def test_tag_reuse_across_documents(self, client, temp_storage, db_session):
         """Test that tags are reused across multiple documents."""
         # Upload first document with tags
-        files1 = {"file": ("doc1.pdf", BytesIO(b"Content 1"), "application/pdf")}
+        files1 = {"file": ("doc1.pdf", BytesIO(b"%PDF-1.4 content 1"), "application/pdf")}
         data1 = {"title": "Document 1", "tags": "shared, tag1"}
         response1 = client.post("/documents/upload", files=files1, data=data1)
         doc1_id = response1.json()["document_id"]
         
         # Upload second document with overlapping tags
-        files2 = {"file": ("doc2.pdf", BytesIO(b"Content 2"), "application/pdf")}
+        files2 = {"file": ("doc2.pdf", BytesIO(b"%PDF-1.4 content 2"), "application/pdf")}
         data2 = {"title": "Document 2", "tags": "shared, tag2"}
         response2 = client.post("/documents/upload", files=files2, data=data2)
         doc2_id = response2.json()["document_id"]
@@ -209,7 +206,7 @@ class TestTagManagementWorkflow:
         assert results["total"] == 2
         
         # Update document tags
-        files3 = {"file": ("doc1_v2.pdf", BytesIO(b"Content 1 v2"), "application/pdf")}
+        files3 = {"file": ("doc1_v2.pdf", BytesIO(b"%PDF-1.4 content 1 v2"), "application/pdf")}
         data3 = {"title": "Document 1 Updated", "document_id": doc1_id, "tags": "shared, tag3"}
         client.post("/documents/upload", files=files3, data=data3)
         
@@ -277,19 +274,24 @@ class TestErrorHandlingIntegration:
 class TestConcurrentOperations:
     """Test concurrent operations and data consistency."""
     
-    def test_multiple_versions_consistency(self, client, temp_storage):
+    def test_multiple_versions_consistency(self, client, temp_storage, build_multipart):
         """Test that multiple versions maintain consistency."""
         # Upload initial document
-        files = {"file": ("base.pdf", BytesIO(b"Version 1"), "application/pdf")}
+        files = {"file": ("base.pdf", BytesIO(b"%PDF-1.4 version 1"), "application/pdf")}
         data = {"title": "Multi-Version Test"}
         response = client.post("/documents/upload", files=files, data=data)
         doc_id = response.json()["document_id"]
         
-        # Upload multiple versions
+        # Upload multiple versions with pre-built multipart bodies
         for i in range(2, 5):
-            files_v = {"file": (f"v{i}.pdf", BytesIO(f"Version {i}".encode()), "application/pdf")}
-            data_v = {"title": f"Multi-Version Test v{i}", "document_id": doc_id}
-            response_v = client.post("/documents/upload", files=files_v, data=data_v)
+            body, content_type = build_multipart(
+                {"title": f"Multi-Version Test v{i}", "document_id": doc_id},
+                f"v{i}.pdf",
+                f"%PDF-1.4 version {i}".encode()
+            )
+            response_v = client.post(
+                "/documents/upload", content=body, headers={"content-type": content_type}
+            )
             assert response_v.status_code == 200
             assert response_v.json()["version_number"] == i
         
@@ -305,20 +307,20 @@ class TestConcurrentOperations:
         for version_num in range(1, 5):
             download_response = client.get(f"/documents/{doc_id}/download?version={version_num}")
             assert download_response.status_code == 200
-            assert f"Version {version_num}".encode() in download_response.content
+            assert f"version {version_num}".encode() in download_response.content
 
 
 @pytest.mark.integration
 class TestPaginationIntegration:
     """Test pagination across multiple operations."""
     
-    def test_pagination_consistency(self, client, temp_storage):
+    def test_pagination_consistency(self, client, seed_documents):
         """Test that pagination works consistently across list and search."""
-        # Create multiple documents
-        for i in range(10):
-            files = {"file": (f"doc{i}.pdf", BytesIO(f"Content {i}".encode()), "application/pdf")}
-            data = {"title": f"Document {i}", "tags": f"tag{i % 3}"}  # Tags: tag0, tag1, tag2
-            client.post("/documents/upload", files=files, data=data)
+        # Seed multiple documents directly - only pagination is under test
+        seed_documents([
+            {"title": f"Document {i}", "tags": [f"tag{i % 3}"]}  # Tags: tag0, tag1, tag2
+            for i in range(10)
+        ])
         
         # Test list pagination
         page1 = client.get("/documents?skip=0&limit=5").json()
@@ -346,13 +348,13 @@ class TestDataIntegrity:
     def test_document_deletion_cascades(self, client, temp_storage, db_session):
         """Test that deleting a document removes all related data."""
         # Create document with multiple versions and tags
-        files1 = {"file": ("v1.pdf", BytesIO(b"V1"), "application/pdf")}
+        files1 = {"file": ("v1.pdf", BytesIO(b"%PDF-1.4 v1"), "application/pdf")}
         data1 = {"title": "Cascade Test", "tags": "test, cascade"}
         response1 = client.post("/documents/upload", files=files1, data=data1)
         doc_id = response1.json()["document_id"]
         
         # Add second version
-        files2 = {"file": ("v2.pdf", BytesIO(b"V2"), "application/pdf")}
+        files2 = {"file": ("v2.pdf", BytesIO(b"%PDF-1.4 v2"), "application/pdf")}
         data2 = {"title": "Cascade Test", "document_id": doc_id}
         response2 = client.post("/documents/upload", files=files2, data=data2)
         assert response2.status_code == 200
@@ -6,10 +6,10 @@ from io import BytesIO
 class TestSearchDocuments:
     """Tests for GET /documents/search endpoint."""
     
-    def test_search_by_tags_match_any(self, client, sample_document_with_tags):
+    def test_search_by_tags_match_any(self, client, sample_document_with_tags, pdf_bytes):
         """Test searching by tags with match_any (default)."""
         # Create another document with different tag
-        file_content = b"Content"
+        file_content = pdf_bytes
         files = {"file": ("doc.pdf", BytesIO(file_content), "application/pdf")}
         data = {"title": "HR Document", "tags": "hr"}
         client.post("/documents/upload", files=files, data=data)
@@ -21,10 +21,10 @@ class TestSearchDocuments:
         assert data["total"] >= 2
         assert len(data["documents"]) >= 2
     
-    def test_search_by_tags_match_all(self, client, sample_document_with_tags):
+    def test_search_by_tags_match_all(self, client, sample_document_with_tags, pdf_bytes):
         """Test searching by tags with match_all=True."""
         # Create document with only one tag
-        file_content = b"Content"
+        file_content = pdf_bytes
         files = {"file": ("doc.pdf", BytesIO(file_content), "application/pdf")}
         data = {"title": "Single Tag Doc", "tags": "invoice"}
         client.post("/documents/upload", files=files, data=data)
@@ -91,11 +91,11 @@ class TestSearchDocuments:
         assert "total" in data
         assert "documents" in data
     
-    def test_search_pagination(self, client):
+    def test_search_pagination(self, client, pdf_bytes):
         """Test search with pagination."""
         # Create multiple documents
         for i in range(5):
-            file_content = b"Content"
+            file_content = pdf_bytes
             files = {"file": (f"doc{i}.pdf", BytesIO(file_content), "application/pdf")}
             data = {"title": f"Searchable Document {i}"}
             client.post("/documents/upload", files=files, data=data)
@@ -106,9 +106,33 @@ class TestSearchDocuments:
         data = response.json()
         assert len(data["documents"]) <= 2
     
-    def test_search_with_special_characters(self, client):
+    def test_search_keyset_pagination(self, client, pdf_bytes):
+        """Test search with keyset cursor pagination."""
+        # Create multiple documents
+        for i in range(5):
+            file_content = pdf_bytes
+            files = {"file": (f"doc{i}.pdf", BytesIO(file_content), "application/pdf")}
+            data = {"title": f"Cursor Document {i}"}
+            client.post("/documents/upload", files=files, data=data)
+
+        page1 = client.get("/documents/search?query=Cursor&limit=2").json()
+        assert len(page1["documents"]) == 2
+        assert page1["next_cursor"] is not None
+
+        cursor = page1["next_cursor"]
+        page2 = client.get(
+            f"/documents/search?query=Cursor&limit=2"
+            f"&after_created_at={cursor['created_at']}&after_id={cursor['id']}"
+        ).json()
+
+        assert len(page2["documents"]) == 2
+        page1_ids = {doc["id"] for doc in page1["documents"]}
+        page2_ids = {doc["id"] for doc in page2["documents"]}
+        assert page1_ids.isdisjoint(page2_ids)
+
+    def test_search_with_special_characters(self, client, pdf_bytes):
         """Test search with special characters in query."""
-        file_content = b"Content"
+        file_content = pdf_bytes
         files = {"file": ("doc.pdf", BytesIO(file_content), "application/pdf")}
         data = {"title": "Test & Special Document"}
         client.post("/documents/upload", files=files, data=data)
@@ -123,7 +123,7 @@ class TestSaveFile:
     
     def test_save_file_creates_directory(self, temp_storage):
         """Test that save_file creates necessary directories."""
-        file = BytesIO(b"Test PDF content")
+        file = BytesIO(b"%PDF-1.4 test PDF content")
         file.name = "test.pdf"
         file.content_type = "application/pdf"
         upload_file = UploadFile(file=file, filename="test.pdf")
@@ -136,7 +136,7 @@ class TestSaveFile:
     
     def test_save_file_version_naming(self, temp_storage):
         """Test that saved file has correct version naming."""
-        file = BytesIO(b"Test content")
+        file = BytesIO(b"%PDF-1.4 test content")
         file.name = "test.pdf"
         file.content_type = "application/pdf"
         upload_file = UploadFile(file=file, filename="test.pdf")
@@ -145,10 +145,23 @@ class TestSaveFile:
         
         assert "v2_" in Path(file_path).name
     
+    def test_save_file_wrong_magic_bytes_fails(self, temp_storage):
+        """Test that content not matching the extension's signature is rejected."""
+        file = BytesIO(b"Not actually a PDF")
+        file.name = "fake.pdf"
+        file.content_type = "application/pdf"
+        upload_file = UploadFile(file=file, filename="fake.pdf")
+
+        with pytest.raises(HTTPException) as exc_info:
+            storage.save_file(upload_file, document_id=1, version_number=1)
+
+        assert exc_info.value.status_code == 400
+        assert "does not match" in exc_info.value.detail
+
     def test_save_file_large_file_fails(self, temp_storage):
         """Test that saving large file raises error."""
         # Create file larger than max size
-        large_content = b"x" * (storage.MAX_FILE_SIZE + 1)
+        large_content = b"%PDF-" + b"x" * storage.MAX_FILE_SIZE
         file = BytesIO(large_content)
         file.name = "large.pdf"
         file.content_type = "application/pdf"